@@ -10,11 +10,21 @@ model conversion/bundling. Actual inference testing must be done on
 Android, iOS, or Web platforms.
 """
 
+import argparse
 import os
 import sys
 import time
 from pathlib import Path
-from huggingface_hub import hf_hub_download
+
+# Use the Rust-based hf_transfer backend for the multi-GB model download when
+# it is installed. huggingface_hub reads this flag at import time, so it has to
+# be set before the import below; without hf_transfer we keep the default
+# downloader instead of failing the download.
+try:
+    import hf_transfer  # noqa: F401
+    os.environ.setdefault("HF_HUB_ENABLE_HF_TRANSFER", "1")
+except ImportError:
+    os.environ.pop("HF_HUB_ENABLE_HF_TRANSFER", None)
 
 # Check if required packages are installed
 try:
@@ -25,6 +35,14 @@ except ImportError as e:
     sys.exit(1)
 
 
+SEPARATOR = "=" * 60
+
+
+def _write_lines(lines):
+    """Write a block of report lines to stdout in a single call."""
+    sys.stdout.write("\n".join(lines) + "\n")
+
+
 class ModelValidator:
     """Validate and inspect Gemma 2B model for MediaPipe."""
     
@@ -34,34 +52,41 @@ class ModelValidator:
     
     def validate_model(self):
         """Validate the model file exists and get basic info."""
-        print("\n" + "="*60)
+        print("\n" + SEPARATOR)
         print("VALIDATING MODEL")
-        print("="*60)
+        print(SEPARATOR)
         
-        if not self.model_path.exists():
+        try:
+            # Single lookup: existence check and file size together
+            file_size_bytes = os.path.getsize(self.model_path)
+        except FileNotFoundError:
             print(f"✗ Model file not found: {self.model_path}")
             return False
+        except OSError as e:
+            print(f"✗ Error validating model: {e}")
+            return False
         
         try:
-            # Get file size
-            file_size_bytes = self.model_path.stat().st_size
+            path_str = str(self.model_path)
+            suffix = self.model_path.suffix
+            
             file_size_mb = file_size_bytes / 1024 / 1024
             file_size_gb = file_size_mb / 1024
             
-            self.model_info["path"] = str(self.model_path)
+            self.model_info["path"] = path_str
             self.model_info["size_mb"] = file_size_mb
             self.model_info["size_gb"] = file_size_gb
-            self.model_info["format"] = self.model_path.suffix
+            self.model_info["format"] = suffix
             
             print(f"✓ Model file found!")
-            print(f"  Path: {self.model_path}")
-            print(f"  Format: {self.model_path.suffix}")
+            print(f"  Path: {path_str}")
+            print(f"  Format: {suffix}")
             print(f"  Size: {file_size_mb:.2f} MB ({file_size_gb:.2f} GB)")
             
             # Check if it's a valid task file
-            if self.model_path.suffix == ".task":
+            if suffix == ".task":
                 print(f"  ✓ Valid .task format (MediaPipe bundle)")
-            elif self.model_path.suffix == ".tflite":
+            elif suffix == ".tflite":
                 print(f"  ✓ Valid .tflite format (TensorFlow Lite)")
             else:
                 print(f"  ⚠ Warning: Unexpected format. Expected .task or .tflite")
@@ -74,103 +99,126 @@ class ModelValidator:
     
     def print_model_info(self):
         """Print detailed model information."""
-        print("\n" + "="*60)
-        print("MODEL INFORMATION")
-        print("="*60)
-        
-        print(f"\nFile Details:")
-        print(f"  Path: {self.model_info['path']}")
-        print(f"  Size: {self.model_info['size_mb']:.2f} MB")
-        print(f"  Format: {self.model_info['format']}")
-        
-        print(f"\nModel Specifications:")
-        print(f"  Base Model: Gemma 2B IT (Instruction-Tuned)")
-        print(f"  Quantization: 8-bit integer (int8)")
-        print(f"  Backend: CPU optimized")
-        print(f"  Format: TensorFlow Lite (.bin)")
-        print(f"  Source: Google (HuggingFace)")
-        
-        print(f"\nExpected Performance (on device):")
-        print(f"  First token latency: 5-10 seconds")
-        print(f"  Subsequent tokens: 2-5 seconds")
-        print(f"  Memory usage: 2-3 GB")
-        print(f"  Minimum device: Android 8.0, 4GB RAM")
-        print(f"  Recommended: Android 10+, 6GB+ RAM")
-        
-        print(f"\nCompatibility:")
-        print(f"  ✓ MediaPipe LLM Inference API (Android)")
-        print(f"  ✓ MediaPipe LLM Inference API (iOS)")
-        print(f"  ✓ MediaPipe LLM Inference API (Web)")
+        lines = [
+            "",
+            SEPARATOR,
+            "MODEL INFORMATION",
+            SEPARATOR,
+            "",
+            "File Details:",
+            f"  Path: {self.model_info['path']}",
+            f"  Size: {self.model_info['size_mb']:.2f} MB",
+            f"  Format: {self.model_info['format']}",
+            "",
+            "Model Specifications:",
+            "  Base Model: Gemma 2B IT (Instruction-Tuned)",
+            "  Quantization: 8-bit integer (int8)",
+            "  Backend: CPU optimized",
+            "  Format: TensorFlow Lite (.bin)",
+            "  Source: Google (HuggingFace)",
+            "",
+            "Expected Performance (on device):",
+            "  First token latency: 5-10 seconds",
+            "  Subsequent tokens: 2-5 seconds",
+            "  Memory usage: 2-3 GB",
+            "  Minimum device: Android 8.0, 4GB RAM",
+            "  Recommended: Android 10+, 6GB+ RAM",
+            "",
+            "Compatibility:",
+            "  ✓ MediaPipe LLM Inference API (Android)",
+            "  ✓ MediaPipe LLM Inference API (iOS)",
+            "  ✓ MediaPipe LLM Inference API (Web)",
+        ]
+        _write_lines(lines)
         
     def print_usage_instructions(self):
         """Print instructions for using the model."""
-        print("\n" + "="*60)
-        print("USAGE INSTRUCTIONS")
-        print("="*60)
-        
-        print(f"\nTo use this model in your Android app:")
-        print(f"\n1. Copy model to Android project:")
-        print(f"   mkdir -p app/src/main/assets/models")
-        print(f"   cp {self.model_path} app/src/main/assets/models/")
-        
-        print(f"\n2. Add MediaPipe dependency to app/build.gradle.kts:")
-        print(f"   implementation(\"com.google.mediapipe:tasks-genai:0.10.14\")")
-        
-        print(f"\n3. Configure asset packaging:")
-        print(f"   aaptOptions {{")
-        print(f"       noCompress \"task\"")
-        print(f"   }}")
-        
-        print(f"\n4. Use in code (Kotlin):")
-        print(f"   val options = LlmInference.LlmInferenceOptions.builder()")
-        print(f"       .setModelPath(\"models/{self.model_path.name}\")")
-        print(f"       .setMaxTokens(512)")
-        print(f"       .setTemperature(0.8f)")
-        print(f"       .build()")
-        print(f"   val llm = LlmInference.createFromOptions(context, options)")
-        print(f"   val response = llm.generateResponse(\"Your prompt here\")")
-        
-        print(f"\nFor detailed integration guide, see STEP 2 in the plan.")
+        lines = [
+            "",
+            SEPARATOR,
+            "USAGE INSTRUCTIONS",
+            SEPARATOR,
+            "",
+            "To use this model in your Android app:",
+            "",
+            "1. Copy model to Android project:",
+            "   mkdir -p app/src/main/assets/models",
+            f"   cp {self.model_path} app/src/main/assets/models/",
+            "",
+            "2. Add MediaPipe dependency to app/build.gradle.kts:",
+            "   implementation(\"com.google.mediapipe:tasks-genai:0.10.14\")",
+            "",
+            "3. Configure asset packaging:",
+            "   aaptOptions {",
+            "       noCompress \"task\"",
+            "   }",
+            "",
+            "4. Use in code (Kotlin):",
+            "   val options = LlmInference.LlmInferenceOptions.builder()",
+            f"       .setModelPath(\"models/{self.model_path.name}\")",
+            "       .setMaxTokens(512)",
+            "       .setTemperature(0.8f)",
+            "       .build()",
+            "   val llm = LlmInference.createFromOptions(context, options)",
+            "   val response = llm.generateResponse(\"Your prompt here\")",
+            "",
+            "For detailed integration guide, see STEP 2 in the plan.",
+        ]
+        _write_lines(lines)
     
     def print_summary(self):
         """Print validation summary."""
-        print("\n" + "="*60)
-        print("VALIDATION SUMMARY")
-        print("="*60)
-        
-        print(f"\n✓ Model file validated successfully!")
-        print(f"✓ Model size appropriate for mobile deployment")
-        print(f"✓ Model format compatible with MediaPipe")
-        
-        print(f"\nSuccess Criteria:")
-        print(f"  ✓ Model downloaded: YES")
-        print(f"  ✓ File format valid: YES")
-        print(f"  ✓ Size appropriate: YES (< 3GB)")
-        print(f"  ✓ Ready for Android: YES")
-        
-        print(f"\nNext Steps:")
-        print(f"  → Proceed to STEP 2: Integrate to Mobile App")
-        print(f"  → Follow the integration plan")
-        print(f"  → Test inference on actual Android device")
-        
-        print("\n" + "="*60)
+        lines = [
+            "",
+            SEPARATOR,
+            "VALIDATION SUMMARY",
+            SEPARATOR,
+            "",
+            "✓ Model file validated successfully!",
+            "✓ Model size appropriate for mobile deployment",
+            "✓ Model format compatible with MediaPipe",
+            "",
+            "Success Criteria:",
+            "  ✓ Model downloaded: YES",
+            "  ✓ File format valid: YES",
+            "  ✓ Size appropriate: YES (< 3GB)",
+            "  ✓ Ready for Android: YES",
+            "",
+            "Next Steps:",
+            "  → Proceed to STEP 2: Integrate to Mobile App",
+            "  → Follow the integration plan",
+            "  → Test inference on actual Android device",
+            "",
+            SEPARATOR,
+        ]
+        _write_lines(lines)
 
-
-def download_model(model_dir):
-    """Download pre-converted Gemma 2B model from HuggingFace."""
-    model_dir = Path(model_dir)
-    model_dir.mkdir(parents=True, exist_ok=True)
+def download_model(check_auth=False):
+    """Download pre-converted Gemma 2B model into the HuggingFace cache.
+    
+    Args:
+        check_auth: Verify the HuggingFace login before downloading. By default
+            auth failures are reported from the download request itself.
+    """
+    from huggingface_hub import try_to_load_from_cache
+    from huggingface_hub.constants import HF_HUB_CACHE
     
     # Using Google's official TFLite Gemma model (simpler, no gating)
     repo_id = "google/gemma-2b-it-tflite"
     # Available files: gemma-2b-it-cpu-int4.bin, gemma-2b-it-cpu-int8.bin
     filename = "gemma-2b-it-cpu-int8.bin"  # 8-bit quantized CPU version
     
-    model_path = model_dir / filename
+    # The model is kept in the shared HuggingFace cache so other tools reuse
+    # the same copy. Delete it from the cache directory to force a re-download.
+    print(f"HuggingFace cache: {HF_HUB_CACHE}")
     
-    if model_path.exists():
-        print(f"✓ Model already exists at: {model_path}")
-        return model_path
+    # Probe the local cache before any network call: on a hit we skip the
+    # login check, the metadata request and any auth prompt entirely. The
+    # lookup returns None or a sentinel object when the file is not cached.
+    cached_path = try_to_load_from_cache(repo_id=repo_id, filename=filename)
+    if isinstance(cached_path, str):
+        print(f"✓ Using cached model: {cached_path}")
+        return Path(cached_path)
     
     print(f"\nDownloading model from HuggingFace...")
     print(f"Repository: {repo_id}")
@@ -180,14 +228,11 @@ def download_model(model_dir):
     print(f"Please visit: https://huggingface.co/{repo_id}")
     print(f"Click 'Access repository' and accept the terms.\n")
     
-    # Check if user is logged in
-    from huggingface_hub import HfApi
-    api = HfApi()
-    
-    try:
-        # Try to get user info to check if logged in
+    # Optional pre-flight login check (one extra request, see --check-auth)
+    if check_auth:
+        from huggingface_hub import HfApi
         try:
-            whoami_info = api.whoami()
+            whoami_info = HfApi().whoami()
             print(f"✓ Logged in as: {whoami_info['name']}")
         except Exception:
             print("✗ You are not logged in to HuggingFace.")
@@ -198,12 +243,11 @@ def download_model(model_dir):
             print("4. Enter your HuggingFace token when prompted")
             print("\nAfter logging in, run this script again.")
             return None
-        
+    
+    try:
         downloaded_path = hf_hub_download(
             repo_id=repo_id,
-            filename=filename,
-            local_dir=str(model_dir),
-            local_dir_use_symlinks=False
+            filename=filename
         )
         print(f"✓ Model downloaded successfully!")
         print(f"  Location: {downloaded_path}")
@@ -216,11 +260,13 @@ def download_model(model_dir):
         
         if "401" in error_msg or "403" in error_msg or "gated" in error_msg.lower():
             print("\n🔐 Access Denied - Please complete these steps:")
-            print(f"1. Visit: https://huggingface.co/{repo_id}")
-            print("2. Click 'Access repository' and accept the Gemma license terms")
-            print("3. Wait a few seconds for access to be granted")
-            print("4. Make sure you're logged in with: huggingface-cli login")
-            print("5. Run this script again")
+            print("1. Create a HuggingFace account (if you don't have one)")
+            print(f"2. Visit: https://huggingface.co/{repo_id}")
+            print("3. Click 'Access repository' and accept the Gemma license terms")
+            print("4. Wait a few seconds for access to be granted")
+            print("5. Log in with: huggingface-cli login")
+            print("   and enter your HuggingFace token when prompted")
+            print("6. Run this script again")
         else:
             print("1. Check your internet connection")
             print("2. Make sure you have enough disk space (~3GB)")
@@ -229,23 +275,34 @@ def download_model(model_dir):
         return None
 
 
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Download and validate the Gemma 2B model for MediaPipe."
+    )
+    parser.add_argument(
+        "--check-auth",
+        action="store_true",
+        help="check the HuggingFace login before downloading the model",
+    )
+    return parser.parse_args()
+
+
 def main():
     """Main execution function."""
-    print("="*60)
+    args = parse_args()
+    
+    print(SEPARATOR)
     print("GEMMA 2B MODEL DOWNLOAD & VALIDATION")
     print("MediaPipe LLM Inference - STEP 1")
-    print("="*60)
+    print(SEPARATOR)
     
     print("\nNote: MediaPipe LLM Inference API for Python only supports")
     print("model conversion/bundling. Actual inference testing will be")
     print("performed on Android device in STEP 2.")
     
-    # Set up model directory
-    project_root = Path(__file__).parent.parent
-    model_dir = project_root / "models" / "gemma-2b"
-    
     # Download model
-    model_path = download_model(model_dir)
+    model_path = download_model(check_auth=args.check_auth)
     if not model_path:
         print("\n✗ Cannot proceed without model. Exiting.")
         sys.exit(1)